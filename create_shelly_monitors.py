@@ -59,21 +59,11 @@ Arguments:
 
 import argparse
 from pathlib import Path
-from typing import List, Optional
+from typing import Optional
 
 from uptime_kuma_api import UptimeKumaApi, MonitorType, UptimeKumaException
 
-
-def read_shellies(path: Path) -> List[str]:
-    """Liest alle Shelly-IP-Adressen aus der Datei."""
-    ips: List[str] = []
-    with path.open(encoding="utf-8") as f:
-        for line in f:
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#"):
-                continue
-            ips.append(stripped)
-    return ips
+from shelly_util import load_hosts
 
 
 def get_or_create_group_id(api: UptimeKumaApi, group_name: str) -> int:
@@ -206,7 +196,7 @@ def main() -> None:
     if not shellies_path.is_file():
         raise SystemExit(f"Shellies-Datei nicht gefunden: {shellies_path}")
 
-    ips = read_shellies(shellies_path)
+    ips = load_hosts(shellies_path)
     if not ips:
         raise SystemExit("Keine Shelly-IP-Adressen in der Datei gefunden.")
 
@@ -1,8 +1,18 @@
 #!/usr/bin/python3
 
 import argparse
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
+from shelly_util import DEFAULT_WORKERS, SESSION, load_hosts, positive_int, size_pool
+
+DESCRIPTION = "Set UDP Debug target on Shelly Gen2 devices."
+
+print_lock = threading.Lock()
+
 def set_gen2_udp_debug(ip, target_host, target_port):
     url = f"http://{ip}/rpc/Sys.SetConfig"
     payload = {
@@ -16,30 +26,45 @@ def set_gen2_udp_debug(ip, target_host, target_port):
     }
 
     try:
-        response = requests.post(url, json=payload, timeout=5)
+        response = SESSION.post(url, json=payload, timeout=5)
         response.raise_for_status()
-        print(f"[✓] {ip}: Debug-Ziel gesetzt auf {target_host}:{target_port}")
+        msg = f"[✓] {ip}: Debug-Ziel gesetzt auf {target_host}:{target_port}"
+        ok = True
     except requests.exceptions.HTTPError as e:
-        print(f"[✗] {ip}: HTTP-Fehler - {e.response.status_code} {e.response.reason}")
-    except requests.exceptions.RequestException as e:
-        print(f"[✗] {ip}: Verbindungsfehler - {e}")
+        msg = f"[✗] {ip}: HTTP-Fehler - {e.response.status_code} {e.response.reason}"
+        ok = False
+    except (requests.exceptions.RequestException, ValueError) as e:
+        msg = f"[✗] {ip}: Verbindungsfehler - {e}"
+        ok = False
 
-def main():
-    parser = argparse.ArgumentParser(description="Set UDP Debug target on Shelly Gen2 devices.")
+    with print_lock:
+        print(msg)
+    return ok
+
+def add_arguments(parser):
     parser.add_argument("--host", required=True, help="Ziel-Host für UDP-Debug (z. B. 192.168.1.100)")
     parser.add_argument("--port", required=True, help="UDP-Port (z. B. 514)")
     parser.add_argument("--file", default="shellies.txt", help="Pfad zur Datei mit Shelly-IP-Adressen")
-    args = parser.parse_args()
+    parser.add_argument("--workers", type=positive_int, default=DEFAULT_WORKERS, help="Anzahl paralleler Verbindungen (Standard: 32)")
 
+def run(args):
     try:
-        with open(args.file, "r") as f:
-            shellies = [line.strip() for line in f if line.strip()]
+        shellies = load_hosts(args.file)
     except FileNotFoundError:
         print(f"Datei {args.file} nicht gefunden.")
-        return
+        return 1
+
+    size_pool(args.workers)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(lambda ip: set_gen2_udp_debug(ip, args.host, args.port), shellies))
 
-    for ip in shellies:
-        set_gen2_udp_debug(ip, args.host, args.port)
+    # Exit-Code wie shelly-restart.py: 2, sobald ein Gerät fehlgeschlagen ist
+    return 2 if not all(results) else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    add_arguments(parser)
+    return run(parser.parse_args())
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -31,12 +31,13 @@ Usage:
 Options:
 --------
 --file <path>     Path to a file containing Shelly hostnames or IPs (one per line). Default is `/root/shellies.txt`.
+--workers <n>     Number of devices configured in parallel (default: 32).
 
 Behavior:
 ---------
 For each device listed in the file, the script sends an MQTT configuration using
-the `/rpc/MQTT.SetConfig` endpoint. It also optionally triggers a reboot to apply
-the changes (depending on your implementation logic).
+the `/rpc/MQTT.SetConfig` endpoint. If the device reports `restart_required`,
+it also triggers a reboot (`/rpc/Shelly.Reboot`) to apply the changes.
 
 Each device is configured with:
 - MQTT server
@@ -55,18 +56,17 @@ Andreas Laub
 
 """
 
+import json
 import requests
-import time
 import argparse
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# 📥 Argumente parsen
-parser = argparse.ArgumentParser(description="Configure Shelly MQTT Settings")
-parser.add_argument("--file", default="shellies.txt", help="Path to file containing Shelly hostnames")
-args = parser.parse_args()
+# 🔌 Gemeinsame HTTP-Session (Keep-Alive, Connection-Pool) und Geräteliste
+from shelly_util import DEFAULT_WORKERS, SESSION, load_hosts, positive_int, size_pool
 
-# 📥 Hostnamen aus Datei einlesen
-with open(args.file, "r") as f:
-    shelly_hosts = [line.strip() for line in f if line.strip()]
+DESCRIPTION = "Configure Shelly MQTT Settings"
 
 # 🔐 Authentifizierung (falls nötig)
 auth = None  # Beispiel: auth = ('admin', 'passwort')
@@ -84,37 +84,77 @@ base_config = {
     "enable_rpc": True,
     "enable_control": True
 }
+JSON_HEADERS = {"Content-Type": "application/json"}
 
-# 🛠 Konfiguration + Neustart anwenden
-for host in shelly_hosts:
-    print(f"\n🔄 MQTT-Konfiguration senden an {host} ...")
+# 🖨️ Ausgaben der parallelen Worker nicht vermischen
+print_lock = threading.Lock()
+
+def log(*lines):
+    with print_lock:
+        print("\n".join(lines))
+
+# 🛠 Konfiguration + Neustart für einen Host anwenden
+def configure_host(host):
+    log(f"\n🔄 MQTT-Konfiguration senden an {host} ...")
     try:
         client_id = host.split('.')[0]
         topic_prefix = f"shelly/{client_id}"
 
-        mqtt_config = base_config.copy()
-        mqtt_config["client_id"] = client_id
-        mqtt_config["topic_prefix"] = topic_prefix
-
         url = f"http://{host}/rpc/MQTT.SetConfig"
-        payload = { "config": mqtt_config }
+        mqtt_config = {**base_config, "client_id": client_id, "topic_prefix": topic_prefix}
+        payload = json.dumps({ "config": mqtt_config }).encode()
 
-        response = requests.post(url, json=payload, auth=auth, timeout=5)
+        response = SESSION.post(url, data=payload, headers=JSON_HEADERS, auth=auth, timeout=5)
 
         if response.status_code == 200:
-            print(f"✅ {host}: MQTT erfolgreich konfiguriert.")
+            # ⏭️ Neustart nur, wenn das Gerät ihn zum Übernehmen der Konfiguration verlangt
+            if not response.json().get("restart_required", True):
+                log(f"✅ {host}: MQTT erfolgreich konfiguriert (kein Neustart nötig).")
+                return True
 
             # 🔁 Reboot auslösen
-            print(f"🔁 {host}: Gerät wird neu gestartet ...")
-            reboot_resp = requests.post(f"http://{host}/rpc/Shelly.Reboot", json={}, auth=auth, timeout=3)
+            reboot_resp = SESSION.post(f"http://{host}/rpc/Shelly.Reboot", json={}, auth=auth, timeout=3)
             if reboot_resp.status_code == 200:
-                print(f"✅ {host}: Neustart ausgelöst.")
+                reboot_msg = f"✅ {host}: Neustart ausgelöst."
             else:
-                print(f"⚠️  {host}: Neustart fehlgeschlagen – {reboot_resp.text}")
-            time.sleep(1)  # ⏱️ kurze Pause zwischen Geräten (optional)
+                reboot_msg = f"⚠️  {host}: Neustart fehlgeschlagen – {reboot_resp.text}"
+            log(f"✅ {host}: MQTT erfolgreich konfiguriert.",
+                f"🔁 {host}: Gerät wird neu gestartet ...",
+                reboot_msg)
+            return reboot_resp.status_code == 200
 
         else:
-            print(f"❌ {host}: Fehler {response.status_code} – {response.text}")
+            log(f"❌ {host}: Fehler {response.status_code} – {response.text}")
+            return False
+
+    except (requests.exceptions.RequestException, ValueError) as e:
+        log(f"❌ {host}: Netzwerkfehler oder nicht erreichbar – {e}")
+        return False
+
+# 📥 Argumente
+def add_arguments(parser):
+    parser.add_argument("--file", default="shellies.txt", help="Path to file containing Shelly hostnames")
+    parser.add_argument("--workers", type=positive_int, default=DEFAULT_WORKERS, help="Number of devices configured in parallel")
+
+# 🚀 Alle Hosts parallel konfigurieren
+def run(args):
+    try:
+        shelly_hosts = load_hosts(args.file)
+    except FileNotFoundError:
+        print(f"File {args.file} not found.")
+        return 1
+
+    size_pool(args.workers)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(configure_host, shelly_hosts))
+
+    # ❗ Exit-Code 2, sobald ein Gerät nicht konfiguriert oder neu gestartet werden konnte
+    return 2 if not all(results) else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    add_arguments(parser)
+    return run(parser.parse_args())
 
-    except Exception as e:
-        print(f"❌ {host}: Netzwerkfehler oder nicht erreichbar – {e}")
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,37 +23,42 @@ Author:
 import argparse
 import requests
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from shelly_util import DEFAULT_WORKERS, SESSION, load_hosts, positive_int, size_pool
+
+DESCRIPTION = "Restart Shelly Gen2/Gen3 devices via RPC"
 
 def restart_device(host, timeout=5, auth=None):
     url = f"http://{host}/rpc/Shelly.Reboot"
     try:
         # Wichtig: JSON-Body "{}" mitsenden, sonst kommt HTTP 400
-        r = requests.post(url, json={}, timeout=timeout, auth=auth)
+        r = SESSION.post(url, json={}, timeout=timeout, auth=auth)
         if r.status_code == 200:
             return True, "Reboot triggered"
         else:
             return False, f"HTTP {r.status_code} - {r.text}"
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         return False, str(e)
 
-def main():
-    parser = argparse.ArgumentParser(description="Restart Shelly Gen2/Gen3 devices via RPC")
+def add_arguments(parser):
     parser.add_argument("-f", "--file", required=True,
                         help="Text file with Shelly hostnames (one per line)")
     parser.add_argument("-u", "--user", help="Username for Shelly authentication")
     parser.add_argument("-p", "--password", help="Password for Shelly authentication")
-    args = parser.parse_args()
+    parser.add_argument("-w", "--workers", type=positive_int, default=DEFAULT_WORKERS,
+                        help="Number of devices restarted in parallel (default: 32)")
 
+def run(args):
     try:
-        with open(args.file, "r", encoding="utf-8") as fh:
-            hosts = [line.strip() for line in fh if line.strip()]
+        hosts = load_hosts(args.file)
     except Exception as e:
         print(f"Error reading file: {e}")
-        sys.exit(1)
+        return 1
 
     if not hosts:
         print("No hosts found in file.")
-        sys.exit(1)
+        return 1
 
     print(f"Restarting {len(hosts)} Shelly devices...\n")
 
@@ -62,8 +67,11 @@ def main():
     success_count = 0
     fail_count = 0
 
-    for host in hosts:
-        ok, msg = restart_device(host, auth=auth)
+    size_pool(args.workers)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(lambda h: (h, *restart_device(h, auth=auth)), hosts))
+
+    for host, ok, msg in results:
         if ok:
             print(f"[OK]   {host}: {msg}")
             success_count += 1
@@ -76,9 +84,14 @@ def main():
     print(f"  Failed:     {fail_count}")
 
     if fail_count > 0:
-        sys.exit(2)
+        return 2
     else:
-        sys.exit(0)
+        return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    add_arguments(parser)
+    return run(parser.parse_args())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
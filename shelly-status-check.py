@@ -8,7 +8,8 @@ Description:
 This script queries a list of Shelly IoT devices and displays an overview of
 their current operational status. It uses the Shelly RPC interface to fetch
 system, WiFi, BLE, MQTT and script information, and presents the data in
-a clear table format using the `tabulate` module.
+a clear table format (plain columns, or a grid via the `tabulate` module
+with --pretty).
 
 Devices are read from a text file (default: /root/shellies.txt), which should
 contain one IP address per line. Sorting can be customized via CLI arguments.
@@ -20,10 +21,12 @@ Dependencies:
 -------------
 - Python 3
 - requests
-- tabulate
+- tabulate (optional, only for --pretty)
+- orjson (optional, faster JSON decoding)
 
 Install dependencies (if not already installed):
-    pip install requests tabulate
+    pip install requests
+    pip install tabulate orjson  # optional
 
 Usage:
 ------
@@ -31,11 +34,14 @@ Usage:
     python3 shelly-status-check.py --file /path/to/devices.txt
     python3 shelly-status-check.py --sort wifi
     python3 shelly-status-check.py --file /path/to/devices.txt --sort wifi
+    python3 shelly-status-check.py --pretty
 
 Options:
 --------
 --file <path>     Path to the text file containing Shelly IP addresses (default: /root/shellies.txt)
 --sort <key>      Sorting criteria: 'ip', 'uptime', or 'wifi' (default: 'ip')
+--workers <n>     Number of devices queried in parallel (default: 32)
+--pretty          Print a grid table using `tabulate` (slower on large inventories)
 
 Expected Output:
 ----------------
@@ -58,23 +64,28 @@ Andreas Laub
 """
 # nmap -sP 192.168.60.0/24 | grep "shelly" | awk '/Nmap scan report/ {print $5}' > /root/shellies.txt
 
-import requests
-from tabulate import tabulate
+import json
+import socket
 import argparse
+import sys
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import attrgetter
+from typing import NamedTuple, Union
 
-# Argumentparser
-parser = argparse.ArgumentParser(description="Shelly Status Übersicht")
-parser.add_argument("--sort", choices=["uptime", "wifi", "ip", "devtype"], default="ip", help="Sortierkriterium")
-parser.add_argument("--file", default="shellies.txt", help="Pfad zur Datei mit Shelly-IP-Adressen")
-args = parser.parse_args()
+from urllib3.util import parse_url
 
-# Geräte einlesen
-with open(args.file, "r") as f:
-    shelly_ips = [line.strip() for line in f if line.strip()]
+from shelly_util import DEFAULT_WORKERS, SESSION, load_hosts, positive_int, size_pool
 
-auth = None  # z. B. ('admin', 'passwort')
+try:
+    # orjson dekodiert die Antworten deutlich schneller, ist aber optional
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
-table_data = []
+DESCRIPTION = "Shelly Status Übersicht"
+
+auth = None  # z. B. ('admin', 'passwort')
 
 def format_uptime(seconds):
     try:
@@ -92,58 +103,135 @@ def parse_rssi(value):
     except:
         return float('-inf')
 
-for ip in shelly_ips:
-    row = {
-        "IP": ip,
-        "Device Type": "–",
-        "Reachable": "❌",
-        "Uptime": "–",
-        "UptimeRaw": 0,
-        "Eco Mode": "–",
-        "WiFi (dBm)": "–",
-        "Bluetooth": "–",
-        "MQTT": "–",
-        "Debug UDP": "–",
-        "Scripts": "–"
-    }
+class ShellyRow(NamedTuple):
+    # Die ersten Felder entsprechen den Tabellenspalten, danach folgen vorberechnete Sortierschlüssel
+    ip: str
+    device_type: str = "–"
+    reachable: str = "❌"
+    uptime: str = "–"
+    eco_mode: Union[bool, str] = "–"
+    wifi: Union[int, str] = "–"
+    bluetooth: str = "–"
+    mqtt: str = "–"
+    debug_udp: str = "–"
+    scripts: str = "–"
+    uptime_raw: float = 0.0
+    rssi_raw: float = float('-inf')
 
-    try:
-        sysconf = requests.get(f"http://{ip}/rpc/Sys.GetConfig", auth=auth, timeout=5).json()
-        sysstatus = requests.get(f"http://{ip}/rpc/Sys.GetStatus", auth=auth, timeout=5).json()
-        wifi = requests.get(f"http://{ip}/rpc/WiFi.GetStatus", auth=auth, timeout=5).json()
-        ble = requests.get(f"http://{ip}/rpc/BLE.GetConfig", auth=auth, timeout=5).json()
-        scripts = requests.get(f"http://{ip}/rpc/Script.List", auth=auth, timeout=5).json()
-        mqtt = requests.get(f"http://{ip}/rpc/MQTT.GetConfig", auth=auth, timeout=5).json()
-        devinfo = requests.get(f"http://{ip}/rpc/Shelly.GetDeviceInfo", auth=auth, timeout=5).json()
-
-        row["Device Typ"] = f'{devinfo.get("app", "–")} (Gen {devinfo.get("gen", "?")})'
-        row["Reachable"] = "✅"
-        row["Eco Mode"] = sysconf.get('device', {}).get('eco_mode', "n.a.")
-        row["Debug UDP"] = sysconf.get('debug', {}).get('udp', {}).get('addr', "–")
-        row["Uptime"] = format_uptime(sysstatus.get("uptime", 0))
-        row["UptimeRaw"] = sysstatus.get("uptime", 0)
-        row["WiFi (dBm)"] = wifi.get("rssi", "❓")
-        row["Bluetooth"] = "✅" if ble.get("enable", False) else "❌"
-        row["MQTT"] = "✅" if mqtt.get('enable', False) else "❌"
-        script_names = [s["name"] for s in scripts.get("scripts", [])]
-        row["Scripts"] = ", ".join(script_names) if script_names else "–"
+headers = ["IP", "Device Typ", "Reachable", "Uptime", "Eco Mode", "WiFi (dBm)", "Bluetooth", "MQTT", "Debug UDP", "Scripts"]
 
-    except Exception:
-        pass
+def display_width(text):
+    # Emojis wie ✅ ❌ ❓ belegen im Terminal zwei Spalten, zählen für len() aber nur als eins
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
 
-    table_data.append(row)
+def print_table(rows, headers):
+    # Einfache Spaltenausgabe: Breiten in einem Durchlauf bestimmen, alles in einem write() ausgeben
+    cells = [headers] + [[str(c) for c in row] for row in rows]
+    cell_widths = [[display_width(c) for c in row] for row in cells]
+    widths = [max(col) for col in zip(*cell_widths)]
 
-# 🔀 Sortierlogik
-if args.sort == "uptime":
-    table_data.sort(key=lambda row: float(row.get("UptimeRaw", 0)), reverse=True)
-elif args.sort == "wifi":
-    table_data.sort(key=lambda row: parse_rssi(row["WiFi (dBm)"]), reverse=True)
-elif args.sort == "devtype":
-    table_data.sort(key=lambda row: (row.get("Device Typ", ""), row.get("IP", "")))
-else:  # Standard: IP
-    table_data.sort(key=lambda row: row["IP"])
+    def fmt(row, row_widths):
+        return " | ".join(c + " " * (w - cw) for c, cw, w in zip(row, row_widths, widths)).rstrip()
 
-# Ausgabe
-headers = ["IP", "Device Typ", "Reachable", "Uptime", "Eco Mode", "WiFi (dBm)", "Bluetooth", "MQTT", "Debug UDP", "Scripts"]
-rows = [[row.get(h, "") for h in headers] for row in table_data]
-print(tabulate(rows, headers=headers, tablefmt="grid"))
+    lines = [fmt(cells[0], cell_widths[0]), "-+-".join("-" * w for w in widths)]
+    lines.extend(fmt(row, row_widths) for row, row_widths in zip(cells[1:], cell_widths[1:]))
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def reachable(ip, timeout=1.0):
+    # Schneller TCP-Check, damit Offline-Geräte nicht erst in den RPC-Timeout laufen.
+    # Host und Port kommen aus derselben URL wie die RPCs, damit auch Einträge wie "host:8080" funktionieren.
+    try:
+        url = parse_url(f"http://{ip}")
+        if not url.host:
+            return False
+        with socket.create_connection((url.host.strip("[]"), url.port or 80), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        # ValueError: ungültiger Eintrag (z. B. leeres oder zu langes Label), URL-Parsing oder IDNA-Kodierung schlägt fehl
+        return False
+
+def rpc(ip, method):
+    return json_loads(SESSION.get(f"http://{ip}/rpc/{method}", auth=auth, timeout=5).content)
+
+def fetch_row(ip):
+    if not reachable(ip):
+        return ShellyRow(ip=ip)
+
+    try:
+        # Shelly.GetConfig/GetStatus liefern alle Komponenten (sys, wifi, ble, mqtt, script:N) auf einmal
+        devinfo = rpc(ip, "Shelly.GetDeviceInfo")
+        config = rpc(ip, "Shelly.GetConfig")
+        status = rpc(ip, "Shelly.GetStatus")
+
+        sysconf = config.get("sys", {})
+        uptime = status.get("sys", {}).get("uptime", 0)
+        rssi = status.get("wifi", {}).get("rssi", "❓")
+        scripts = sorted((v for k, v in config.items() if k.startswith("script:")), key=lambda s: s.get("id", 0))
+        script_names = [s["name"] for s in scripts]
+
+        return ShellyRow(
+            ip=ip,
+            device_type=f'{devinfo.get("app", "–")} (Gen {devinfo.get("gen", "?")})',
+            reachable="✅",
+            uptime=format_uptime(uptime),
+            eco_mode=sysconf.get('device', {}).get('eco_mode', "n.a."),
+            wifi=rssi,
+            bluetooth="✅" if config.get("ble", {}).get("enable", False) else "❌",
+            mqtt="✅" if config.get("mqtt", {}).get('enable', False) else "❌",
+            debug_udp=sysconf.get('debug', {}).get('udp', {}).get('addr', "–"),
+            scripts=", ".join(script_names) if script_names else "–",
+            uptime_raw=float(uptime),
+            rssi_raw=parse_rssi(rssi),
+        )
+
+    except Exception:
+        return ShellyRow(ip=ip)
+
+# Argumentparser
+def add_arguments(parser):
+    parser.add_argument("--sort", choices=["uptime", "wifi", "ip", "devtype"], default="ip", help="Sortierkriterium")
+    parser.add_argument("--file", default="shellies.txt", help="Pfad zur Datei mit Shelly-IP-Adressen")
+    parser.add_argument("--workers", type=positive_int, default=DEFAULT_WORKERS, help="Anzahl parallel abgefragter Geräte")
+    parser.add_argument("--pretty", action="store_true", help="Tabelle mit Rahmen über tabulate ausgeben")
+
+def run(args):
+    # Geräte einlesen
+    try:
+        shelly_ips = load_hosts(args.file)
+    except FileNotFoundError:
+        print(f"Datei {args.file} nicht gefunden.")
+        return 1
+    table_data = []
+
+    size_pool(args.workers)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(fetch_row, ip) for ip in shelly_ips]
+        for future in as_completed(futures):
+            table_data.append(future.result())
+
+    # 🔀 Sortierlogik
+    if args.sort == "uptime":
+        table_data.sort(key=attrgetter("uptime_raw"), reverse=True)
+    elif args.sort == "wifi":
+        table_data.sort(key=attrgetter("rssi_raw"), reverse=True)
+    elif args.sort == "devtype":
+        table_data.sort(key=attrgetter("device_type", "ip"))
+    else:  # Standard: IP
+        table_data.sort(key=attrgetter("ip"))
+
+    # Ausgabe
+    rows = [row[:len(headers)] for row in table_data]
+    if args.pretty:
+        from tabulate import tabulate
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
+    else:
+        print_table(rows, headers)
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    add_arguments(parser)
+    return run(parser.parse_args())
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shelly.py - One CLI for the Shelly Gen2+ Python scripts
+
+Description:
+    Runs the device list scripts of this repository as subcommands of a single
+    process. All subcommands share one HTTP session (keep-alive connection pool)
+    and the device list loader from shelly_util.py. Several subcommands can be
+    chained with a standalone "+"; they run one after another in the same
+    process (Python startup, `requests` import and open connections are reused)
+    and the chain stops at the first subcommand that exits non-zero: the device
+    list cannot be read (1), or at least one device failed (2; restart,
+    mqtt-config and debug). `status` only fails on an unreadable device list,
+    since it reports unreachable devices in its table.
+
+    Subcommand     Script
+    status         shelly-status-check.py
+    restart        shelly-restart.py
+    mqtt-config    shelly-mqtt-config.py
+    debug          shelly-debug-setter.py
+
+    Each subcommand takes the same options as its script; the scripts keep
+    working stand-alone.
+
+Usage:
+    ./shelly.py status --sort wifi
+    ./shelly.py restart -f shellies.txt
+    ./shelly.py mqtt-config --file shellies.txt
+    ./shelly.py debug --host 192.168.1.100 --port 514
+    ./shelly.py debug --host 192.168.1.100 --port 514 + status
+    ./shelly.py <subcommand> --help
+
+Requirements:
+    - Python 3.x
+    - requests library (pip install requests)
+    - tabulate library, only for `status --pretty` (pip install tabulate)
+
+Author:
+    Andreas Laub, 2025
+"""
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+
+SUBCOMMANDS = {
+    "status": "shelly-status-check.py",
+    "restart": "shelly-restart.py",
+    "mqtt-config": "shelly-mqtt-config.py",
+    "debug": "shelly-debug-setter.py",
+}
+
+def load_script(filename):
+    # Die Skripte haben Bindestriche im Namen und lassen sich nicht per "import" laden
+    path = Path(__file__).resolve().parent / filename
+    spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def split_chain(argv):
+    # "a --x + b --y" -> [["a", "--x"], ["b", "--y"]]
+    chain = [[]]
+    for arg in argv:
+        if arg == "+":
+            chain.append([])
+        else:
+            chain[-1].append(arg)
+    return chain
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Shelly Gen2/Gen3 device tools",
+        epilog='Chain subcommands with a standalone "+", e.g.: debug --host 192.168.1.100 --port 514 + status')
+    subparsers = parser.add_subparsers(dest="command", metavar="<subcommand>")
+    subparsers.required = True
+
+    for name, filename in SUBCOMMANDS.items():
+        script = load_script(filename)
+        subparser = subparsers.add_parser(name, help=script.DESCRIPTION, description=script.DESCRIPTION)
+        script.add_arguments(subparser)
+        subparser.set_defaults(run=script.run)
+
+    # Erst alle Glieder der Kette parsen, damit Tippfehler nichts halb ausführen
+    chain = [parser.parse_args(part) for part in split_chain(sys.argv[1:] if argv is None else argv)]
+    for args in chain:
+        rc = args.run(args)
+        if rc:
+            return rc
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
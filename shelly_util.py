@@ -0,0 +1,65 @@
+"""
+Gemeinsame Hilfsfunktionen für die Shelly-Python-Skripte.
+
+Wird von shelly.py, shelly-debug-setter.py, shelly-mqtt-config.py,
+shelly-restart.py, shelly-status-check.py und create_shelly_monitors.py
+importiert und muss daher im selben Verzeichnis wie diese Skripte liegen.
+"""
+
+import argparse
+from typing import List
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Anzahl parallel angesprochener Geräte (--workers)
+DEFAULT_WORKERS = 32
+
+
+def positive_int(value: str) -> int:
+    """argparse-Typ für Ganzzahlen größer 0 (z. B. --workers)."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"muss größer als 0 sein: {value}")
+    return number
+
+
+# Gemeinsame HTTP-Session (Keep-Alive, Connection-Pool, Retries) für alle Skripte
+SESSION = requests.Session()
+# Shellys sind im LAN: keine Proxy-/netrc-Auswertung aus der Umgebung bei jedem Request
+SESSION.trust_env = False
+_pool_size = 0
+
+
+def size_pool(workers: int) -> None:
+    """
+    Sorgt dafür, dass der Adapter mindestens so viele Host-Pools vorhält, wie
+    Worker parallel laufen. Sonst werden Pools zwischen den RPCs eines Geräts
+    verdrängt und die Keep-Alive-Verbindungen gehen verloren.
+    Der Adapter wird nur ersetzt, wenn er wachsen muss.
+    """
+    global _pool_size
+    size = max(64, workers)
+    if size <= _pool_size:
+        return
+    # Lese- und Status-Retries nur für GET: POSTs wie Shelly.Reboot sind nicht idempotent und
+    # dürfen nicht erneut gesendet werden, wenn das Gerät die Verbindung ohne Antwort schließt.
+    # Verbindungsfehler (Request noch nicht gesendet) werden für alle Methoden wiederholt.
+    SESSION.mount("http://", HTTPAdapter(pool_connections=size, pool_maxsize=size, max_retries=Retry(
+        total=3, connect=2, read=1, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]), raise_on_status=False)))
+    _pool_size = size
+
+
+size_pool(DEFAULT_WORKERS)
+
+
+def load_hosts(path) -> List[str]:
+    """
+    Liest Shelly-Hostnamen bzw. -IP-Adressen aus einer Textdatei (einer pro Zeile).
+    Leere Zeilen und Zeilen, die mit '#' beginnen, werden ignoriert.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    return [line for line in map(str.strip, lines) if line and not line.startswith("#")]